@@ -1,28 +1,88 @@
 import os
-import shutil
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
 from pydantic import BaseModel
+from typing import Optional
 
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+import semchunk
+import tiktoken
 from langchain_openai import OpenAIEmbeddings
 try:
     from langchain_ollama import OllamaEmbeddings
 except ImportError:
     OllamaEmbeddings = None
 
-from rag_graph import build_graph
+from embeddings import BatchedEmbeddings
+from pdf_loader import load_pdf
+from indexing import build_vectorstore, latest_index_path
+from cache import AnswerCache
+from sessions import SessionRegistry
 from logging_config import setup_logging, get_logger
 
 # Configure Logging
 setup_logging()
 logger = get_logger(__name__)
 
-app = FastAPI(title="Self-Correcting RAG for Docs API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global pdf_executor
+    # spawn, not fork: by now the process has event loop, Faiss/OpenMP and HTTP
+    # client threads, and a forked child could inherit a lock one of them held
+    pdf_executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+    
+    # Restore the most recently indexed document so a restart doesn't require re-uploading
+    index_path = latest_index_path(INDEX_DIR)
+    if index_path:
+        try:
+            session_id = os.path.basename(index_path)
+            if await sessions.get(session_id):
+                sessions.latest_id = session_id
+                logger.info("Loaded saved index: %s", index_path)
+        except Exception as e:
+            logger.error("Failed to load saved index %s: %s", index_path, e)
+    yield
+    
+    pdf_executor.shutdown()
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values (e.g. gzip;q=0)."""
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+class QualityAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that also honours q-values, so `gzip;q=0` gets an uncompressed response."""
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+app = FastAPI(title="Self-Correcting RAG for Docs API", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -33,97 +93,181 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variables
-vectorstore = None
-rag_app = None
+# Compress answers and static assets; tiny responses aren't worth it
+app.add_middleware(QualityAwareGZipMiddleware, minimum_size=1024)
+
+# Worker processes for parallel PDF text extraction, created at startup
+pdf_executor = None
+
+# Saved indexes, one directory per uploaded file content hash
+INDEX_DIR = os.getenv("INDEX_DIR", "indexes")
 
 class ChatRequest(BaseModel):
     question: str
     temperature: float = 0.5
+    # Returned by /upload; defaults to the most recently uploaded document
+    session_id: Optional[str] = None
+
+class ChatResponse(BaseModel):
+    answer: str
+    trace: str
+    final_question: Optional[str] = None
+
+class UploadResponse(BaseModel):
+    message: str
+    count: int
+    session_id: str
 
+@lru_cache(maxsize=1)
 def get_embeddings():
     if os.environ.get("OPENAI_API_KEY"):
         logger.info("Using OpenAI Embeddings")
-        return OpenAIEmbeddings()
+        embeddings = OpenAIEmbeddings()
     else:
         logger.info("Using Ollama Embeddings (nomic-embed-text)")
         # Make sure the user has this model: 'ollama pull nomic-embed-text'
-        return OllamaEmbeddings(model="nomic-embed-text")
+        embeddings = OllamaEmbeddings(model="nomic-embed-text")
+    # Send chunks to the provider in batches instead of one request each
+    return BatchedEmbeddings(embeddings, batch_size=128)
+
+# Opt-in reuse of answers for near-duplicate questions: max squared L2
+# distance between normalized question embeddings (e.g. 0.01). Unset means
+# only exact repeats of a question are served from the cache.
+SEMANTIC_CACHE_THRESHOLD = float(os.environ["SEMANTIC_CACHE_THRESHOLD"]) if os.environ.get("SEMANTIC_CACHE_THRESHOLD") else None
+
+# Indexed documents, one session per uploaded file
+sessions = SessionRegistry(INDEX_DIR, get_embeddings, semantic_cache_threshold=SEMANTIC_CACHE_THRESHOLD)
 
-@app.post("/upload")
+@lru_cache(maxsize=1)
+def _get_chunker():
+    """
+    Token-based chunker, built once on first upload: creating the tiktoken
+    encoding is not free, and the first call downloads its BPE file, which
+    must not stop the server from starting offline.
+    """
+    encoding = tiktoken.get_encoding("cl100k_base")
+    # disallowed_special=() so PDFs containing e.g. "<|endoftext|>" don't fail to split
+    return semchunk.chunkerify(lambda text: len(encoding.encode(text, disallowed_special=())), chunk_size=300)
+
+def _load_and_split(data: bytes, filename: str):
+    """
+    Parse an in-memory PDF and split it into chunks.
+    Runs in a worker thread so the event loop stays responsive.
+    """
+    docs = load_pdf(data, filename, executor=pdf_executor)
+    # semchunk counts tokens far fewer times than RecursiveCharacterTextSplitter
+    chunks_per_doc = _get_chunker()([doc.page_content for doc in docs], overlap=50)
+    return [
+        Document(page_content=chunk, metadata=dict(doc.metadata))
+        for doc, chunks in zip(docs, chunks_per_doc)
+        for chunk in chunks
+    ]
+
+@app.post("/upload", response_model=UploadResponse)
 async def upload_file(file: UploadFile = File(...)):
-    global vectorstore, rag_app
-    
     try:
-        # Save temp file
-        file_location = f"temp_{file.filename}"
-        with open(file_location, "wb+") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Load and Split
-        loader = PyPDFLoader(file_location)
-        docs = loader.load()
-        text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-            chunk_size=300, chunk_overlap=50
-        )
-        doc_splits = text_splitter.split_documents(docs)
+        # Parse straight from memory, no temp file on disk
+        data = await file.read()
         
-        # Embed and Store
-        embedding_model = get_embeddings()
-
-        vectorstore = FAISS.from_documents(
-            documents=doc_splits,
-            embedding=embedding_model,
-        )
+        # The content hash doubles as the session id and saved index name
+        session_id = hashlib.sha256(data).hexdigest()
+        index_path = sessions.index_path(session_id)
         
-        # Build the graph with the new retriever
-        retriever = vectorstore.as_retriever()
-        rag_app = build_graph(retriever)
+        async def build():
+            # Load and Split (CPU/IO heavy, offloaded to a thread)
+            doc_splits = await asyncio.to_thread(_load_and_split, data, file.filename)
+            
+            # Embed and Store
+            return await asyncio.to_thread(build_vectorstore, doc_splits, get_embeddings())
         
-        # Cleanup
-        os.remove(file_location)
+        session, built = await sessions.get_or_build(session_id, build)
+        if not built:
+            # Same file indexed before: reused instead of re-embedding
+            logger.info("Reusing saved index: %s", index_path)
+            # Mark as most recently used for the next startup
+            os.utime(index_path)
         
-        return {"message": "File processed and indexed successfully", "count": len(doc_splits)}
+        count = session.vectorstore.index.ntotal
+        return {"message": "File processed and indexed successfully", "count": count, "session_id": session_id}
         
     except Exception as e:
-        logger.error(f"Error processing file: {e}")
+        logger.error("Error processing file: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/chat")
+@app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
-    global rag_app
+    logger.info("Received chat request: %s", request.question)
     
-    logger.info(f"Received chat request: {request.question}")
-    
-    if not rag_app:
-        logger.error("RAG App not initialized")
+    session = await sessions.get(request.session_id)
+    if session is None:
+        logger.error("No indexed document for session: %s", request.session_id)
         raise HTTPException(status_code=400, detail="Please upload a document first.")
+    answer_cache = session.answer_cache
+    
+    cache_key = AnswerCache.make_key(request.question, request.temperature)
+    cached = await answer_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Answer served from cache.")
+        return cached
     
     inputs = {"question": request.question}
     
     try:
+        question_vector = None
+        if answer_cache.semantic_enabled:
+            # Embedding the question here also primes the retriever's query cache
+            question_vector = await asyncio.to_thread(session.vectorstore.embedding_function.embed_query, request.question)
+            cached = await answer_cache.get_similar(question_vector)
+            if cached is not None:
+                logger.info("Answer served from cache (similar question).")
+                return cached
+        
         logger.info("Invoking RAG Graph...")
-        result = rag_app.invoke(inputs)
+        result = await session.rag_app.ainvoke(inputs)
         logger.info("RAG Graph Finished.")
         
         answer = result.get("generation", "No answer generated.")
-        logger.info(f"Answer generated: {answer[:50]}...")
+        logger.info("Answer generated: %.50s...", answer)
         
-        return {
+        response = {
             "answer": answer,
             "trace": "Trace logic would go here",
             "final_question": result.get("question")
         }
+        await answer_cache.set(cache_key, response, vector=question_vector)
+        return response
     except Exception as e:
-        logger.error(f"Error in RAG execution: {e}", exc_info=True)
+        logger.error("Error in RAG execution: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a pre-built `<file>.gz` next to the requested
+    file when the client accepts gzip, so assets aren't recompressed on
+    every request. Falls back to the plain file otherwise.
+    """
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code != 200 or not isinstance(response, FileResponse):
+            return response
+        
+        gz_path = f"{response.path}.gz"
+        if accepts_gzip(Headers(scope=scope).get("accept-encoding", "")) and os.path.isfile(gz_path):
+            return FileResponse(
+                gz_path,
+                media_type=response.media_type,
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+        return response
+
 # Mount Frontend
 # We assume the frontend folder is at ../frontend relative to this file?
 # Actually, the file is in backend/app.py, so frontend is ../frontend
 frontend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
-app.mount("/", StaticFiles(directory=frontend_path, html=True), name="frontend")
+app.mount("/", PrecompressedStaticFiles(directory=frontend_path, html=True), name="frontend")
 
+# Prefer `uvicorn app:app`: when run as a script, every spawned PDF worker
+# re-imports this module as __mp_main__ (LangChain, Faiss, logging setup)
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,83 @@
+"""
+Answer caching for the Self-Correcting RAG System
+"""
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+from cachetools import TTLCache
+
+
+class AnswerCache:
+    """
+    Caches final graph results for `/chat`.
+
+    Exact hits are keyed by a hash of the normalized question and the
+    temperature. Optionally, near-duplicate questions can also be served
+    through a small Faiss index of question embeddings: a cached answer is
+    reused when the squared L2 distance between normalized vectors is below
+    `semantic_threshold`. This is off by default (None), because embeddings
+    often rate questions with different answers (e.g. "revenue in 2020" vs
+    "revenue in 2021") as near-identical.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: int = 3600, semantic_threshold: Optional[float] = None):
+        self.maxsize = maxsize
+        self.semantic_threshold = semantic_threshold
+        self._answers = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+        self._question_index: Optional[faiss.Index] = None
+        self._question_keys: List[bytes] = []
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_threshold is not None
+
+    @staticmethod
+    def make_key(question: str, temperature: float) -> bytes:
+        """Hash the normalized question together with the temperature."""
+        normalized = " ".join(question.strip().lower().split())
+        return hashlib.blake2b(f"{normalized}\x00{temperature}".encode("utf-8")).digest()
+
+    @staticmethod
+    def _as_matrix(vector: List[float]) -> np.ndarray:
+        matrix = np.asarray([vector], dtype=np.float32)
+        faiss.normalize_L2(matrix)
+        return matrix
+
+    async def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            return self._answers.get(key)
+
+    async def get_similar(self, vector: List[float]) -> Optional[Dict[str, Any]]:
+        """Return the answer cached for the closest known question, if close enough."""
+        if not self.semantic_enabled:
+            return None
+        async with self._lock:
+            if self._question_index is None or self._question_index.ntotal == 0:
+                return None
+            distances, ids = self._question_index.search(self._as_matrix(vector), 1)
+            if ids[0][0] < 0 or distances[0][0] > self.semantic_threshold:
+                return None
+            # Entries expired from the TTL cache simply miss here
+            return self._answers.get(self._question_keys[ids[0][0]])
+
+    async def set(self, key: bytes, value: Dict[str, Any], vector: Optional[List[float]] = None) -> None:
+        async with self._lock:
+            self._answers[key] = value
+            if vector is None or not self.semantic_enabled:
+                return
+            if self._question_index is None or len(self._question_keys) >= self.maxsize:
+                # Rebuild rather than evict individual vectors from the flat index
+                self._question_index = faiss.IndexFlatL2(len(vector))
+                self._question_keys = []
+            self._question_index.add(self._as_matrix(vector))
+            self._question_keys.append(key)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            self._answers.clear()
+            self._question_index = None
+            self._question_keys = []
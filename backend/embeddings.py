@@ -0,0 +1,84 @@
+"""
+Embedding helpers for the Self-Correcting RAG System
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Iterable, Iterator, List
+
+from cachetools import LRUCache
+from langchain_core.embeddings import Embeddings
+
+
+def _batched(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Yield successive lists of at most `size` items."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model so documents are sent to the provider in
+    batches through its native `embed_documents` API.
+
+    Batches are issued concurrently (bounded by `max_concurrency`), which
+    turns dozens of sequential round-trips per upload into a handful of
+    parallel ones. Query embeddings are kept in an LRU cache so repeated
+    questions skip the provider entirely.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        batch_size: int = 128,
+        max_concurrency: int = 8,
+        query_cache_size: int = 2048,
+    ):
+        self.inner = inner
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self._query_cache = LRUCache(maxsize=query_cache_size)
+        self._query_lock = threading.Lock()
+
+    def _cached_query(self, text: str):
+        with self._query_lock:
+            return self._query_cache.get(text)
+
+    def _cache_query(self, text: str, vector: List[float]) -> None:
+        with self._query_lock:
+            self._query_cache[text] = vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        batches = list(_batched(texts, self.batch_size))
+        if len(batches) <= 1:
+            return list(chain.from_iterable(self.inner.embed_documents(b) for b in batches))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+            # map() preserves batch order, so vectors line up with texts
+            return list(chain.from_iterable(executor.map(self.inner.embed_documents, batches)))
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self._cached_query(text)
+        if vector is None:
+            vector = self.inner.embed_query(text)
+            self._cache_query(text, vector)
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _embed(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.inner.aembed_documents(batch)
+
+        results = await asyncio.gather(*[_embed(b) for b in _batched(texts, self.batch_size)])
+        return list(chain.from_iterable(results))
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = self._cached_query(text)
+        if vector is None:
+            vector = await self.inner.aembed_query(text)
+            self._cache_query(text, vector)
+        return vector
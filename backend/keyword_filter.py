@@ -0,0 +1,84 @@
+"""
+Keyword relevance scoring for the Self-Correcting RAG System
+"""
+import math
+import re
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from langchain_core.documents import Document
+from rank_bm25 import BM25Okapi
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Words that say nothing about relevance (common English stopwords plus
+# the filler typical of chat questions, e.g. "tell me about")
+_STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are as at be because been before
+    being below between both but by can could did do does doing down during each explain few
+    for from further give had has have having he her here hers herself him himself his how i
+    if in into is it its itself just know me more most my myself no nor not now of off on once
+    only or other our ours ourselves out over own please same she should show so some such
+    tell than that the their theirs them themselves then there these they this those through
+    to too under until up us very was we were what when where which while who whom why will
+    with would you your yours yourself yourselves
+    """.split()
+)
+
+# Fraction of the question's keyword weight (the summed IDF of its terms) a
+# chunk must match for it to be relevant without asking the LLM. Normalizing
+# by the query's IDF keeps the cutoff independent of corpus size, since raw
+# BM25 scores grow with the number of chunks. A chunk matching every query
+# term once, at average length, scores about 1.0.
+ACCEPT_SCORE = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class KeywordScorer:
+    """
+    BM25 scorer over the indexed chunks, used as a cheap first pass before
+    the LLM relevance grader.
+
+    Only strong keyword matches are decided here. Chunks that don't share
+    the question's keywords are never rejected, since they may still match
+    in meaning (retrieval is vector-based); those are left to the LLM.
+    """
+
+    def __init__(self, documents: Iterable[Document], accept_score: float = ACCEPT_SCORE):
+        texts = [doc.page_content for doc in documents]
+        tokenized = [tokenize(text) for text in texts]
+        self.accept_score = accept_score
+        self._positions = {text: i for i, text in enumerate(texts)}
+        self._doc_freqs = Counter(term for tokens in tokenized for term in set(tokens))
+        self._bm25 = BM25Okapi(tokenized) if texts else None
+
+    def _idf(self, term: str) -> float:
+        """Unfloored BM25 IDF; negative for terms in more than half of the chunks."""
+        doc_freq = self._doc_freqs[term]
+        return math.log(self._bm25.corpus_size - doc_freq + 0.5) - math.log(doc_freq + 0.5)
+
+    def grade(self, question: str, documents: List[Document]) -> List[Optional[bool]]:
+        """
+        Return True (relevant) or None (undecided, ask the LLM) per document.
+        """
+        if self._bm25 is None:
+            return [None] * len(documents)
+        # Terms found in most chunks don't distinguish one chunk from another
+        query = [term for term in tokenize(question) if self._idf(term) > 0]
+        if not query:
+            return [None] * len(documents)
+        scores = self._bm25.get_scores(query) / sum(self._idf(term) for term in query)
+
+        grades = []
+        for doc in documents:
+            position = self._positions.get(doc.page_content)
+            if position is not None and scores[position] >= self.accept_score:
+                grades.append(True)
+            else:
+                grades.append(None)
+        return grades
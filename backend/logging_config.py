@@ -10,6 +10,7 @@ from datetime import datetime
 def setup_logging(
     log_level: str = None, 
     log_file: str = None,
+    file_log_level: str = None,
     max_bytes: int = 10_000_000,  # 10MB
     backup_count: int = 5
 ):
@@ -19,12 +20,16 @@ def setup_logging(
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional log file path. If None, logs to console only.
+        file_log_level: Logging level for the log file. Defaults to log_level;
+            set e.g. WARNING in production to skip INFO records on disk.
         max_bytes: Maximum size of log file before rotation
         backup_count: Number of backup log files to keep
     """
     # Get log level from environment or parameter
     if log_level is None:
         log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    if file_log_level is None:
+        file_log_level = os.getenv("LOG_FILE_LEVEL", log_level).upper()
     
     # Configure logging format
     log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -35,7 +40,12 @@ def setup_logging(
     
     # Get root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_level))
+    # Root level is the most verbose of the two handlers, so records neither
+    # handler wants are dropped before any formatting happens
+    root_level = getattr(logging, log_level)
+    if log_file:
+        root_level = min(root_level, getattr(logging, file_log_level))
+    root_logger.setLevel(root_level)
     
     # Clear any existing handlers
     root_logger.handlers.clear()
@@ -59,7 +69,7 @@ def setup_logging(
             maxBytes=max_bytes,
             backupCount=backup_count
         )
-        file_handler.setLevel(getattr(logging, log_level))
+        file_handler.setLevel(getattr(logging, file_log_level))
         file_handler.setFormatter(formatter)
         root_logger.addHandler(file_handler)
     
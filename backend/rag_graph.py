@@ -1,3 +1,5 @@
+import asyncio
+from functools import lru_cache
 from typing import Dict, TypedDict, List
 from langgraph.graph import StateGraph, END
 
@@ -13,6 +15,17 @@ import os
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Maximum number of grader LLM calls in flight at once
+GRADER_MAX_CONCURRENCY = 8
+# Stop grading once this many relevant documents are found
+MAX_RELEVANT_DOCS = 3
+# Cross-encoder scores above this count as relevant (ms-marco models output logits)
+CROSS_ENCODER_THRESHOLD = 0.0
+
 # Graph State
 class GraphState(TypedDict):
     """
@@ -26,16 +39,19 @@ class GraphState(TypedDict):
     documents: List[str]
     try_count: int
 
+@lru_cache(maxsize=4)
 def get_llm(model_type="reasoning"):
     """
     Factory to get the right LLM.
     model_type: 'reasoning' (standard) or 'grader' (smart/strict) or 'smart'
+    Instances are cached so the HTTP client and its connection pool are reused.
     """
     api_key = os.environ.get("OPENAI_API_KEY")
     
     if api_key:
         if model_type == "grader":
-            return ChatOpenAI(model="gpt-4", temperature=0)
+            # Graders answer yes/no many times per question, a small fast model is enough
+            return ChatOpenAI(model=os.environ.get("GRADER_MODEL", "gpt-4o-mini"), temperature=0)
         else:
             return ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
     else:
@@ -47,15 +63,105 @@ def get_llm(model_type="reasoning"):
         else:
              return ChatOllama(model="mistral", temperature=0)
 
-def build_graph(retriever):
+@lru_cache(maxsize=1)
+def get_cross_encoder():
+    """
+    Optional local relevance grader, e.g. GRADER_CROSS_ENCODER=cross-encoder/ms-marco-MiniLM-L-6-v2.
+    Scores all documents in one batched call instead of one LLM call each.
+    Returns None if not configured or sentence-transformers isn't installed.
+    """
+    model_name = os.environ.get("GRADER_CROSS_ENCODER")
+    if not model_name:
+        return None
+    # Imported here since it pulls in torch, which unconfigured setups don't need
+    try:
+        from sentence_transformers import CrossEncoder
+    except ImportError:
+        logger.warning("GRADER_CROSS_ENCODER is set but sentence-transformers isn't installed")
+        return None
+    return CrossEncoder(model_name)
+
+# --- Prompts ---
+
+GENERATE_PROMPT = ChatPromptTemplate.from_template(
+    "You are an assistant for question-answering tasks. Use the following pieces of retrieved context to answer the question. If you don't know the answer, just say that you don't know. Use three sentences maximum and keep the answer concise.\nQuestion: {question} \nContext: {context} \nAnswer:"
+)
+
+# Grading prompt
+GRADE_SYSTEM = """You are a grader assessing relevance of a retrieved document to a user question. \n 
+    If the document contains keyword(s) or semantic meaning related to the user question, grade it as relevant. \n
+    Give a binary score 'yes' or 'no' score to indicate whether the document is relevant to the question."""
+GRADE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", GRADE_SYSTEM),
+        ("human", "Retrieved document: \n\n {document} \n\n User question: {question}"),
+    ]
+)
+
+# Re-write prompt
+REWRITE_SYSTEM = """You a question re-writer that converts an input question to a better version that is optimized \n 
+    for vectorstore retrieval. Look at the input and try to reason about the underlying semantic intent / meaning."""
+REWRITE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", REWRITE_SYSTEM),
+        ("human", "Here is the initial question: \n\n {question} \n Formulate an improved question."),
+    ]
+)
+
+# Hallucination Grader
+HALLUCINATION_SYSTEM = """You are a grader assessing whether an LLM generation is grounded in / supported by a set of retrieved facts. \n 
+    Give a binary score 'yes' or 'no'. 'Yes' means the answer is grounded in and supported by the set of facts."""
+HALLUCINATION_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", HALLUCINATION_SYSTEM),
+        ("human", "Set of facts: \n\n {documents} \n\n LLM generation: {generation}"),
+    ]
+)
+
+# Answer Relevance Grader
+ANSWER_SYSTEM = """You are a grader assessing whether an answer addresses / resolves a question. \n 
+    Give a binary score 'yes' or 'no'. 'Yes' means the answer resolves the question."""
+ANSWER_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", ANSWER_SYSTEM),
+        ("human", "User question: \n\n {question} \n\n LLM generation: {generation}"),
+    ]
+)
+
+# --- Chains ---
+# Built lazily (the LLM depends on environment config) and then reused.
+
+@lru_cache(maxsize=None)
+def get_generate_chain():
+    return GENERATE_PROMPT | get_llm("reasoning") | StrOutputParser()
+
+@lru_cache(maxsize=None)
+def get_grade_chain():
+    return GRADE_PROMPT | get_llm("grader")
+
+@lru_cache(maxsize=None)
+def get_rewrite_chain():
+    return REWRITE_PROMPT | get_llm("reasoning") | StrOutputParser()
+
+@lru_cache(maxsize=None)
+def get_hallucination_chain():
+    return HALLUCINATION_PROMPT | get_llm("grader")
+
+@lru_cache(maxsize=None)
+def get_answer_chain():
+    return ANSWER_PROMPT | get_llm("grader")
+
+def build_graph(retriever, keyword_scorer=None):
     """
     Builds the Self-Correcting RAG Graph.
+    If a keyword_scorer is given, strong keyword matches are graded relevant
+    without calling the LLM.
     """
     
     # --- Nodes ---
     
     def retrieve(state):
-        print("---RETRIEVE---")
+        logger.info("---RETRIEVE---")
         question = state["question"]
         try:
             # Modern LangChain uses invoke
@@ -67,7 +173,7 @@ def build_graph(retriever):
         return {"documents": documents, "question": question}
 
     def generate(state):
-        print("---GENERATE---")
+        logger.info("---GENERATE---")
         question = state["question"]
         documents = state["documents"]
         try_count = state.get("try_count", 0) + 1
@@ -76,76 +182,94 @@ def build_graph(retriever):
         context = "\n\n".join([doc.page_content if hasattr(doc, 'page_content') else str(doc) for doc in documents])
         
         # Simple generation chain
-        llm = get_llm("reasoning")
-        prompt = ChatPromptTemplate.from_template(
-            "You are an assistant for question-answering tasks. Use the following pieces of retrieved context to answer the question. If you don't know the answer, just say that you don't know. Use three sentences maximum and keep the answer concise.\nQuestion: {question} \nContext: {context} \nAnswer:"
-        )
-        chain = prompt | llm | StrOutputParser()
-        generation = chain.invoke({"context": context, "question": question})
+        generation = get_generate_chain().invoke({"context": context, "question": question})
         return {"documents": documents, "question": question, "generation": generation, "try_count": try_count}
 
-    def grade_documents(state):
-        print("---CHECK RELEVANCE---")
+    async def grade_documents(state):
+        logger.info("---CHECK RELEVANCE---")
         question = state["question"]
         documents = state["documents"]
         
+        # Cheap keyword pass first, only ambiguous docs go to the LLM
+        keyword_grades = keyword_scorer.grade(question, documents) if keyword_scorer else [None] * len(documents)
+        relevant = []
+        ambiguous = []
+        for i, keyword_grade in enumerate(keyword_grades):
+            if keyword_grade:
+                logger.debug("Strong keyword match for doc, relevant")
+                relevant.append(i)
+            else:
+                ambiguous.append(i)
+        
+        # Local cross-encoder, if configured, replaces the LLM grader entirely
+        # Loaded in a thread: the first call downloads and loads the model
+        cross_encoder = None
+        if ambiguous and os.environ.get("GRADER_CROSS_ENCODER"):
+            cross_encoder = await asyncio.to_thread(get_cross_encoder)
+        if cross_encoder is not None:
+            pairs = [(question, documents[i].page_content) for i in ambiguous]
+            scores = await asyncio.to_thread(cross_encoder.predict, pairs)
+            for i, score in zip(ambiguous, scores):
+                logger.debug("Cross-encoder score for doc: %.2f", score)
+                if score > CROSS_ENCODER_THRESHOLD:
+                    relevant.append(i)
+            ambiguous = []
+        
         # LLM grader
-        llm = get_llm("grader")
-        
-        # Grading prompt
-        system = """You are a grader assessing relevance of a retrieved document to a user question. \n 
-            If the document contains keyword(s) or semantic meaning related to the user question, grade it as relevant. \n
-            Give a binary score 'yes' or 'no' score to indicate whether the document is relevant to the question."""
-        
-        grade_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system),
-                ("human", "Retrieved document: \n\n {document} \n\n User question: {question}"),
-            ]
-        )
+        grader_chain = get_grade_chain()
         
-        grader_chain = grade_prompt | llm
+        # Grade remaining docs concurrently, the calls are independent
+        semaphore = asyncio.Semaphore(GRADER_MAX_CONCURRENCY)
         
-        # Filter relevant docs
-        filtered_docs = []
-        for d in documents:
-            score = grader_chain.invoke({"question": question, "document": d.page_content})
-            print(f"DEBUG: Grade result for doc: {score.content}")
-            # Relaxed parsing: Check if 'yes' is anywhere in the response
-            if "yes" in score.content.lower():
-                filtered_docs.append(d)
+        async def grade(i, d):
+            async with semaphore:
+                score = await grader_chain.ainvoke({"question": question, "document": d.page_content})
+            return i, score
+        
+        tasks = []
+        if len(relevant) < MAX_RELEVANT_DOCS:
+            tasks = [asyncio.create_task(grade(i, documents[i])) for i in ambiguous]
+        
+        # Filter relevant docs, stopping early once we have enough for generation
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                i, score = await next_done
+                logger.debug("Grade result for doc: %s", score.content)
+                # Relaxed parsing: Check if 'yes' is anywhere in the response
+                if "yes" in score.content.lower():
+                    relevant.append(i)
+                    if len(relevant) >= MAX_RELEVANT_DOCS:
+                        logger.info("---ENOUGH RELEVANT DOCUMENTS, SKIPPING REMAINING GRADES---")
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Keep retrieval order
+        filtered_docs = [documents[i] for i in sorted(relevant)]
         
         # Fallback: If no docs passed, keep all of them (avoid strict filtering locally)
         if not filtered_docs:
-            print("WARNING: All documents filtered out. Keeping original retrieval for robustness.")
+            logger.warning("All documents filtered out. Keeping original retrieval for robustness.")
             filtered_docs = documents
 
         return {"documents": filtered_docs, "question": question}
 
     def transform_query(state):
-        print("---TRANSFORM QUERY---")
+        logger.info("---TRANSFORM QUERY---")
         question = state["question"]
         documents = state["documents"]
         
         # Re-write question
-        llm = get_llm("reasoning")
-        system = """You a question re-writer that converts an input question to a better version that is optimized \n 
-            for vectorstore retrieval. Look at the input and try to reason about the underlying semantic intent / meaning."""
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system),
-                ("human", "Here is the initial question: \n\n {question} \n Formulate an improved question."),
-            ]
-        )
-        chain = prompt | llm | StrOutputParser()
-        better_question = chain.invoke({"question": question})
+        better_question = get_rewrite_chain().invoke({"question": question})
         
         return {"documents": documents, "question": better_question}
 
     # --- Edges ---
     
     def decide_to_generate(state):
-        print("---DECIDE TO GENERATE---")
+        logger.info("---DECIDE TO GENERATE---")
         filtered_documents = state["documents"]
         
         if not filtered_documents:
@@ -157,8 +281,8 @@ def build_graph(retriever):
             return "generate"
 
     
-    def grade_generation_v_documents_and_question(state):
-        print("---CHECK HALLUCINATIONS---")
+    async def grade_generation_v_documents_and_question(state):
+        logger.info("---CHECK HALLUCINATIONS---")
         question = state["question"]
         documents = state["documents"]
         generation = state["generation"]
@@ -166,53 +290,35 @@ def build_graph(retriever):
         
         # Max retries hit?
         if try_count > 1:
-            print("---DECISION: MAX RETRIES REACHED. RETURNING GENERATION---")
+            logger.info("---DECISION: MAX RETRIES REACHED. RETURNING GENERATION---")
             return "useful"
         
-        llm = get_llm("grader")
+        hallucination_chain = get_hallucination_chain()
+        answer_chain = get_answer_chain()
         
-        # Hallucination Grader
-        system_hallucination = """You are a grader assessing whether an LLM generation is grounded in / supported by a set of retrieved facts. \n 
-            Give a binary score 'yes' or 'no'. 'Yes' means the answer is grounded in and supported by the set of facts."""
-        hallucination_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system_hallucination),
-                ("human", "Set of facts: \n\n {documents} \n\n LLM generation: {generation}"),
-            ]
-        )
-        hallucination_chain = hallucination_prompt | llm
-        
-        # Answer Relevance Grader
-        system_answer = """You are a grader assessing whether an answer addresses / resolves a question. \n 
-            Give a binary score 'yes' or 'no'. 'Yes' means the answer resolves the question."""
-        answer_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system_answer),
-                ("human", "User question: \n\n {question} \n\n LLM generation: {generation}"),
-            ]
+        # Run both graders speculatively; the answer score is discarded if ungrounded
+        hallucination_score, answer_score = await asyncio.gather(
+            hallucination_chain.ainvoke({"documents": documents, "generation": generation}),
+            answer_chain.ainvoke({"question": question, "generation": generation}),
         )
-        answer_chain = answer_prompt | llm
-        
-        hallucination_score = hallucination_chain.invoke({"documents": documents, "generation": generation})
-        print(f"DEBUG: Hallucination Score: {hallucination_score.content}")
+        logger.debug("Hallucination Score: %s", hallucination_score.content)
         
         # Relaxed check for local models
         is_grounded = "yes" in hallucination_score.content.lower()
         
         if is_grounded:
-            print("---DECISION: GENERATION IS GROUNDED IN DOCUMENTS---")
+            logger.info("---DECISION: GENERATION IS GROUNDED IN DOCUMENTS---")
             # Check answer relevance
-            answer_score = answer_chain.invoke({"question": question, "generation": generation})
-            print(f"DEBUG: Answer Relevance Score: {answer_score.content}")
+            logger.debug("Answer Relevance Score: %s", answer_score.content)
             
             if "yes" in answer_score.content.lower():
-                print("---DECISION: GENERATION ADDRESSES QUESTION---")
+                logger.info("---DECISION: GENERATION ADDRESSES QUESTION---")
                 return "useful"
             else:
-                print("---DECISION: GENERATION DOES NOT ADDRESS QUESTION---")
+                logger.info("---DECISION: GENERATION DOES NOT ADDRESS QUESTION---")
                 return "not useful"
         else:
-            print("---DECISION: GENERATION IS NOT GROUNDED IN DOCUMENTS, RE-TRY---")
+            logger.info("---DECISION: GENERATION IS NOT GROUNDED IN DOCUMENTS, RE-TRY---")
             return "not supported"
 
     # --- Build Graph ---
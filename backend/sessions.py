@@ -0,0 +1,127 @@
+"""
+Per-document session registry for the Self-Correcting RAG System
+"""
+import asyncio
+import os
+import re
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from cachetools import LRUCache
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from cache import AnswerCache
+from indexing import load_vectorstore, save_vectorstore
+from keyword_filter import KeywordScorer
+from rag_graph import build_graph
+
+# Session ids are the SHA-256 of the uploaded file, which is also the name
+# of its saved index directory
+_SESSION_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@dataclass
+class Session:
+    """Everything /chat needs to answer questions about one document."""
+    vectorstore: FAISS
+    rag_app: Any
+    answer_cache: AnswerCache
+
+
+async def create_session(vectorstore: FAISS, semantic_cache_threshold: Optional[float] = None) -> Session:
+    """Build the graph (and its keyword prefilter) around a vector store."""
+    # Keyword prefilter over the same chunks, so the LLM grader sees fewer docs
+    chunks = [vectorstore.docstore.search(doc_id) for doc_id in vectorstore.index_to_docstore_id.values()]
+    keyword_scorer = await asyncio.to_thread(KeywordScorer, chunks)
+
+    retriever = vectorstore.as_retriever(search_kwargs={"k": 4})
+    return Session(
+        vectorstore=vectorstore,
+        rag_app=build_graph(retriever, keyword_scorer),
+        answer_cache=AnswerCache(maxsize=2048, ttl=3600, semantic_threshold=semantic_cache_threshold),
+    )
+
+
+class SessionRegistry:
+    """
+    Maps session ids to indexed documents so concurrent users can upload
+    and query their own documents without touching each other's state.
+
+    Only the `max_sessions` most recently used sessions are kept in memory;
+    older ones are transparently reloaded from their saved index.
+    """
+
+    def __init__(
+        self,
+        index_dir: str,
+        get_embeddings: Callable[[], Embeddings],
+        max_sessions: int = 16,
+        semantic_cache_threshold: Optional[float] = None,
+    ):
+        self.index_dir = index_dir
+        self.semantic_cache_threshold = semantic_cache_threshold
+        self._get_embeddings = get_embeddings
+        self._sessions = LRUCache(maxsize=max_sessions)
+        self._lock = asyncio.Lock()
+        # One lock per session id being built, dropped once nobody holds it
+        self._build_locks = weakref.WeakValueDictionary()
+        # Used by clients that don't send a session id
+        self.latest_id: Optional[str] = None
+
+    def index_path(self, session_id: str) -> str:
+        return os.path.join(self.index_dir, session_id)
+
+    async def add(self, session_id: str, vectorstore: FAISS) -> Session:
+        session = await create_session(vectorstore, self.semantic_cache_threshold)
+        async with self._lock:
+            self._sessions[session_id] = session
+            self.latest_id = session_id
+        return session
+
+    async def get(self, session_id: Optional[str] = None) -> Optional[Session]:
+        """
+        Return the session for `session_id` (or the latest one if None),
+        loading it from disk if needed. Returns None for unknown sessions.
+        """
+        async with self._lock:
+            if session_id is None:
+                session_id = self.latest_id
+            if session_id is None:
+                return None
+            session = self._sessions.get(session_id)
+        if session is not None:
+            return session
+
+        # Loaded outside the lock so other sessions aren't blocked meanwhile
+        if not _SESSION_ID_RE.match(session_id) or not os.path.isdir(self.index_path(session_id)):
+            return None
+        vectorstore = await asyncio.to_thread(load_vectorstore, self.index_path(session_id), self._get_embeddings())
+        session = await create_session(vectorstore, self.semantic_cache_threshold)
+        async with self._lock:
+            # Another request may have loaded it first; keep a single instance
+            return self._sessions.setdefault(session_id, session)
+
+    async def get_or_build(self, session_id: str, build: Callable[[], Awaitable[FAISS]]) -> Tuple[Session, bool]:
+        """
+        Return the session for `session_id`, or build it with `build`, save
+        it to disk and register it. Concurrent calls for the same id build
+        it only once; the others wait and reuse the result.
+
+        Returns:
+            The session and whether this call built it
+        """
+        async with self._lock:
+            build_lock = self._build_locks.setdefault(session_id, asyncio.Lock())
+
+        async with build_lock:
+            session = await self.get(session_id)
+            if session is not None:
+                async with self._lock:
+                    self.latest_id = session_id
+                return session, False
+
+            vectorstore = await build()
+            await asyncio.to_thread(save_vectorstore, vectorstore, self.index_path(session_id))
+            return await self.add(session_id, vectorstore), True
@@ -3,6 +3,8 @@ class ChatManager {
         this.messagesContainer = document.getElementById('chat-messages');
         this.input = document.getElementById('user-input');
         this.sendBtn = document.getElementById('send-btn');
+        // Set by the upload response so chats target this user's document
+        this.sessionId = null;
 
         this.setupEventListeners();
     }
@@ -79,7 +81,7 @@ class ChatManager {
             const res = await fetch('/chat', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ question: text })
+                body: JSON.stringify({ question: text, session_id: this.sessionId })
             });
 
             clearInterval(intervalId);
@@ -148,6 +150,8 @@ class ChatManager {
         try {
             const res = await fetch('/upload', { method: 'POST', body: formData });
             if (res.ok) {
+                const data = await res.json();
+                this.sessionId = data.session_id;
                 fileList.innerHTML = `<div class="file-item" style="color:#22c55e"><i class="fa-solid fa-check"></i> ${file.name} (Ready)</div>`;
             } else {
                 fileList.innerHTML = `<div class="file-item" style="color:red"><i class="fa-solid fa-xmark"></i> Upload Failed</div>`;
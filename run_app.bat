@@ -31,7 +31,7 @@ echo Press Ctrl+C to stop the server
 echo.
 
 cd backend
-python app.py
+python -m uvicorn app:app --host 0.0.0.0 --port 8000
 
 echo.
 echo Server stopped.
@@ -40,4 +40,4 @@ echo "Server will be available at: http://localhost:8000"
 echo "Press Ctrl+C to stop the server"
 echo
 
-python3 app.py
\ No newline at end of file
+python3 -m uvicorn app:app --host 0.0.0.0 --port 8000
\ No newline at end of file
@@ -0,0 +1,7 @@
+"""Shared pytest configuration."""
+import os
+import sys
+
+# Backend modules import each other by bare name (e.g. `from cache import ...`),
+# the same way they do when the server runs from the backend directory.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
@@ -0,0 +1,69 @@
+"""Tests for app module helpers."""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app import PrecompressedStaticFiles, QualityAwareGZipMiddleware, accepts_gzip
+
+BODY = "compressible text " * 200
+
+
+class TestAcceptsGzip:
+    """Test cases for Accept-Encoding parsing."""
+
+    @pytest.mark.parametrize(
+        "header",
+        ["gzip", "gzip, deflate, br", "br;q=1.0, GZIP;q=0.5", "*", "deflate, *;q=0.1"],
+    )
+    def test_gzip_accepted(self, header):
+        """gzip is served when listed (or matched by *) with a non-zero q-value."""
+        assert accepts_gzip(header)
+
+    @pytest.mark.parametrize(
+        "header",
+        ["", "br, deflate", "gzip;q=0", "gzip;q=0.0, br", "*;q=0", "gzip;q=0, *", "gzip;q=oops"],
+    )
+    def test_gzip_refused(self, header):
+        """gzip is not served when absent or explicitly disabled with q=0."""
+        assert not accepts_gzip(header)
+
+
+class TestCompression:
+    """Test cases for response compression."""
+
+    @pytest.fixture
+    def static_client(self, tmp_path):
+        (tmp_path / "script.js").write_text(BODY)
+        (tmp_path / "script.js.gz").write_bytes(gzip.compress(BODY.encode()))
+        app = Starlette()
+        app.add_middleware(QualityAwareGZipMiddleware, minimum_size=1024)
+        app.mount("/", PrecompressedStaticFiles(directory=str(tmp_path)))
+        return TestClient(app)
+
+    def test_middleware_honours_q_zero(self):
+        """Dynamic responses aren't gzipped for clients that refuse gzip with q=0."""
+        app = Starlette(routes=[Route("/", lambda request: PlainTextResponse(BODY))])
+        app.add_middleware(QualityAwareGZipMiddleware, minimum_size=1024)
+        client = TestClient(app)
+
+        assert client.get("/", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in client.get("/", headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+    def test_precompressed_file_served_once_compressed(self, static_client):
+        """The .gz file is served as-is, not gzipped a second time by the middleware."""
+        response = static_client.get("/script.js", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == BODY
+
+    def test_plain_file_for_q_zero(self, static_client):
+        """Clients refusing gzip get the uncompressed file."""
+        response = static_client.get("/script.js", headers={"Accept-Encoding": "gzip;q=0"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == BODY
@@ -0,0 +1,57 @@
+"""Tests for cache module."""
+
+import pytest
+
+from cache import AnswerCache
+
+ANSWER = {"answer": "42", "trace": "", "final_question": "q"}
+
+
+class TestAnswerCache:
+    """Test cases for AnswerCache."""
+
+    def test_key_normalization(self):
+        """Keys ignore case and spacing but not punctuation or temperature."""
+        assert AnswerCache.make_key(" What is X? ", 0.5) == AnswerCache.make_key("what  is x?", 0.5)
+        assert AnswerCache.make_key("What is C++?", 0.5) != AnswerCache.make_key("What is C?", 0.5)
+        assert AnswerCache.make_key("What is X?", 0.5) != AnswerCache.make_key("What is X?", 0.0)
+
+    @pytest.mark.asyncio
+    async def test_exact_hit_and_miss(self):
+        """Stored answers are returned for the same key only."""
+        cache = AnswerCache()
+        key = AnswerCache.make_key("What is X?", 0.5)
+
+        await cache.set(key, ANSWER)
+
+        assert await cache.get(key) == ANSWER
+        assert await cache.get(AnswerCache.make_key("What is Y?", 0.5)) is None
+
+    @pytest.mark.asyncio
+    async def test_semantic_reuse_is_off_by_default(self):
+        """Without a threshold, even an identical vector isn't a fuzzy hit."""
+        cache = AnswerCache()
+        await cache.set(b"k", ANSWER, vector=[1.0, 0.0])
+
+        assert not cache.semantic_enabled
+        assert await cache.get_similar([1.0, 0.0]) is None
+
+    @pytest.mark.asyncio
+    async def test_semantic_reuse_when_enabled(self):
+        """With a threshold, only vectors within it reuse the answer."""
+        cache = AnswerCache(semantic_threshold=0.01)
+        await cache.set(b"k", ANSWER, vector=[1.0, 0.0])
+
+        assert await cache.get_similar([1.0, 0.05]) == ANSWER
+        assert await cache.get_similar([1.0, 1.0]) is None
+
+    @pytest.mark.asyncio
+    async def test_clear(self):
+        """Clearing drops exact and semantic entries."""
+        cache = AnswerCache(semantic_threshold=0.01)
+        await cache.set(b"k", ANSWER, vector=[1.0, 0.0])
+
+        await cache.clear()
+
+        assert await cache.get(b"k") is None
+        assert await cache.get_similar([1.0, 0.0]) is None
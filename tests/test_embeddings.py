@@ -0,0 +1,62 @@
+"""Tests for embeddings module."""
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from embeddings import BatchedEmbeddings
+
+
+class RecordingEmbeddings(Embeddings):
+    """Fake embedding model recording every provider call."""
+
+    def __init__(self):
+        self.document_calls = []
+        self.query_calls = []
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [[float(len(t)), float(ord(t[0]))] for t in texts]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return [float(len(text)), float(ord(text[0]))]
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+class TestBatchedEmbeddings:
+    """Test cases for BatchedEmbeddings."""
+
+    def test_documents_batched_in_order(self):
+        """Texts are sent in batches and vectors come back in input order."""
+        inner = RecordingEmbeddings()
+        texts = [chr(ord("a") + i) * (i + 1) for i in range(10)]
+
+        vectors = BatchedEmbeddings(inner, batch_size=3).embed_documents(texts)
+
+        assert sorted(len(c) for c in inner.document_calls) == [1, 3, 3, 3]
+        assert vectors == inner.embed_documents(texts)
+
+    def test_query_cache(self):
+        """Repeated queries hit the provider once; any other text gets its own vector."""
+        inner = RecordingEmbeddings()
+        embeddings = BatchedEmbeddings(inner)
+
+        for text in ["Sales in the US", "Sales in the US", "sales in the us", "What is C?", "What is C++?"]:
+            embeddings.embed_query(text)
+
+        assert inner.query_calls == ["Sales in the US", "sales in the us", "What is C?", "What is C++?"]
+
+    @pytest.mark.asyncio
+    async def test_async_documents_in_order(self):
+        """Async batching also preserves input order."""
+        inner = RecordingEmbeddings()
+        texts = [chr(ord("a") + i) * (i + 1) for i in range(5)]
+
+        vectors = await BatchedEmbeddings(inner, batch_size=2).aembed_documents(texts)
+
+        assert vectors == inner.embed_documents(texts)
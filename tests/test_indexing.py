@@ -0,0 +1,62 @@
+"""Tests for indexing module."""
+
+import os
+
+import faiss
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from indexing import build_vectorstore, latest_index_path, load_vectorstore, save_vectorstore
+
+DOCS = [Document(page_content=f"chunk number {i}", metadata={"page": i}) for i in range(5)]
+
+
+class TestIndexing:
+    """Test cases for building, saving and reloading indexes."""
+
+    def test_save_and_reload(self, tmp_path):
+        """A saved index reloads with the same chunks and search results."""
+        embedding = DeterministicFakeEmbedding(size=16)
+        vectorstore = build_vectorstore(DOCS, embedding)
+        path = str(tmp_path / "abc")
+
+        save_vectorstore(vectorstore, path)
+        reloaded = load_vectorstore(path, embedding)
+
+        assert reloaded.index.ntotal == len(DOCS)
+        result = reloaded.similarity_search("chunk number 3", k=1)[0]
+        assert result.page_content == "chunk number 3"
+        assert result.metadata == {"page": 3}
+
+    def test_save_over_existing_index(self, tmp_path):
+        """Saving to a path another writer already saved to succeeds and leaves no temp dirs."""
+        vectorstore = build_vectorstore(DOCS, DeterministicFakeEmbedding(size=16))
+        path = str(tmp_path / "abc")
+
+        save_vectorstore(vectorstore, path)
+        save_vectorstore(vectorstore, path)
+
+        assert os.listdir(tmp_path) == ["abc"]
+        assert latest_index_path(str(tmp_path)) == path
+
+    def test_latest_index_path_ignores_temp_dirs(self, tmp_path):
+        """Unfinished temp directories are never picked up on startup."""
+        os.makedirs(tmp_path / "abc.123.tmp")
+        (tmp_path / "abc.123.tmp" / "index.faiss").write_bytes(b"")
+
+        assert latest_index_path(str(tmp_path)) is None
+
+    def test_reload_maps_index_file(self, tmp_path):
+        """The reloaded index is memory-mapped rather than copied into RAM."""
+        if not hasattr(faiss, "IO_FLAG_MMAP_IFC") or not os.path.exists("/proc/self/maps"):
+            pytest.skip("Needs IO_FLAG_MMAP_IFC and /proc/self/maps")
+        embedding = DeterministicFakeEmbedding(size=16)
+        path = str(tmp_path / "abc")
+        save_vectorstore(build_vectorstore(DOCS, embedding), path)
+
+        reloaded = load_vectorstore(path, embedding)
+
+        with open("/proc/self/maps") as maps:
+            assert os.path.join(path, "index.faiss") in maps.read()
+        assert reloaded.similarity_search("chunk number 1", k=1)[0].page_content == "chunk number 1"
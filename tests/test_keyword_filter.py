@@ -0,0 +1,76 @@
+"""Tests for keyword_filter module."""
+
+from langchain_core.documents import Document
+
+from keyword_filter import KeywordScorer, tokenize
+
+FILLER = [
+    Document(page_content=f"Chapter {i} covers shipping times, packaging and delivery partners in region {i}.")
+    for i in range(20)
+]
+WEATHER = Document(page_content="Tell me about the weather: it is sunny with light wind today.")
+REFUND = Document(
+    page_content="Our refund policy: a refund is issued within 30 days. The refund policy excludes gift cards."
+)
+
+
+class TestTokenize:
+    """Test cases for tokenization."""
+
+    def test_drops_chat_filler(self):
+        """Filler words like 'tell me about' are not keywords."""
+        assert tokenize("Tell me about my refund policy") == ["refund", "policy"]
+
+
+class TestKeywordScorer:
+    """Test cases for KeywordScorer grading."""
+
+    def test_filler_overlap_is_not_accepted(self):
+        """A chunk sharing only filler words with the question isn't auto-accepted."""
+        scorer = KeywordScorer(FILLER + [WEATHER])
+
+        assert scorer.grade("Tell me about the refund policy", [WEATHER]) == [None]
+
+    def test_no_shared_keywords_is_undecided(self):
+        """With no keyword overlap anywhere, everything is left to the LLM."""
+        scorer = KeywordScorer(FILLER + [WEATHER])
+
+        assert scorer.grade("refund policy", FILLER[:2] + [WEATHER]) == [None, None, None]
+
+    def test_strong_match_accepted(self):
+        """A distinctive keyword match is accepted without the LLM."""
+        scorer = KeywordScorer(FILLER + [WEATHER, REFUND])
+
+        assert scorer.grade("What is the refund policy?", [REFUND]) == [True]
+
+    def test_semantic_match_is_never_rejected(self):
+        """A chunk matching in meaning but not wording is left to the LLM, even next to a strong match."""
+        paraphrase = Document(page_content="Customers may return goods and get their money back within a month.")
+        scorer = KeywordScorer(FILLER + [REFUND, paraphrase])
+
+        assert scorer.grade("What is the refund policy?", [REFUND, paraphrase]) == [True, None]
+
+    def test_threshold_independent_of_corpus_size(self):
+        """The same single-term match grades the same in a small and a large document."""
+        needle = Document(page_content="The warranty lasts two years.")
+        filler = [
+            Document(page_content=f"Section {i} describes installation step {i} in detail.")
+            for i in range(2000)
+        ]
+
+        small = KeywordScorer(filler[:10] + [needle])
+        large = KeywordScorer(filler + [needle])
+
+        assert small.grade("warranty", [needle]) == large.grade("warranty", [needle]) == [True]
+
+    def test_weak_match_is_undecided(self):
+        """Common words alone don't make a chunk relevant."""
+        scorer = KeywordScorer(FILLER + [WEATHER])
+
+        assert scorer.grade("delivery partners", [FILLER[0]]) == [None]
+
+    def test_unknown_document_is_undecided(self):
+        """Documents outside the scored corpus are left to the LLM."""
+        scorer = KeywordScorer(FILLER + [REFUND])
+
+        assert scorer.grade("refund policy", [Document(page_content="not indexed refund")]) == [None]
@@ -0,0 +1,40 @@
+"""Tests for pdf_loader module."""
+
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from reportlab.pdfgen import canvas
+
+from pdf_loader import PARALLEL_MIN_PAGES, load_pdf
+
+
+def make_pdf(num_pages: int) -> bytes:
+    """Build a PDF whose page i contains the text 'page number i'."""
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for i in range(num_pages):
+        pdf.drawString(100, 700, f"page number {i}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class TestLoadPdf:
+    """Test cases for load_pdf."""
+
+    def test_small_pdf_inline(self):
+        """Small PDFs are extracted inline with page metadata."""
+        docs = load_pdf(make_pdf(3), "small.pdf")
+
+        assert [d.page_content.strip() for d in docs] == [f"page number {i}" for i in range(3)]
+        assert docs[2].metadata == {"source": "small.pdf", "page": 2}
+
+    def test_parallel_extraction_keeps_page_order(self):
+        """Large PDFs extracted in spawned worker processes keep page order."""
+        num_pages = PARALLEL_MIN_PAGES * 2 + 1
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+            docs = load_pdf(make_pdf(num_pages), "large.pdf", executor=executor)
+
+        assert [d.page_content.strip() for d in docs] == [f"page number {i}" for i in range(num_pages)]
+        assert [d.metadata["page"] for d in docs] == list(range(num_pages))
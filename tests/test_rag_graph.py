@@ -0,0 +1,248 @@
+"""Tests for rag_graph module."""
+
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+import rag_graph
+from rag_graph import MAX_RELEVANT_DOCS, build_graph
+
+DOCS = [Document(page_content=f"chunk {i}") for i in range(6)]
+
+
+class FakeRetriever:
+    """Retriever returning a fixed list of documents."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def invoke(self, question):
+        return list(self.documents)
+
+
+class FakeGenerateChain:
+    """Generation chain counting its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs):
+        self.calls += 1
+        return "an answer"
+
+
+class FakeGradeChain:
+    """
+    Relevance grader answering from `verdicts` (chunk text -> "yes"/"no").
+    Chunks listed in `blocked` never get an answer until cancelled.
+    """
+
+    def __init__(self, verdicts, blocked=(), delays=None):
+        self.verdicts = verdicts
+        self.blocked = set(blocked)
+        self.delays = delays or {}
+        self.graded = []
+        self.cancelled = []
+
+    async def ainvoke(self, inputs):
+        document = inputs["document"]
+        self.graded.append(document)
+        try:
+            if document in self.blocked:
+                await asyncio.Event().wait()
+            await asyncio.sleep(self.delays.get(document, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(document)
+            raise
+        return AIMessage(content=self.verdicts.get(document, "no"))
+
+
+class FakeGenerationGrader:
+    """Hallucination/answer grader that can wait until its peer has started."""
+
+    def __init__(self, verdicts, started, peer_started=None):
+        self.verdicts = list(verdicts)
+        self.started = started
+        self.peer_started = peer_started
+
+    async def ainvoke(self, inputs):
+        self.started.set()
+        if self.peer_started is not None:
+            # Times out if the two graders run one after the other
+            await asyncio.wait_for(self.peer_started.wait(), timeout=1)
+        return AIMessage(content=self.verdicts.pop(0))
+
+
+class FakeKeywordScorer:
+    """Keyword prefilter accepting a fixed set of chunks."""
+
+    def __init__(self, accepted):
+        self.accepted = set(accepted)
+
+    def grade(self, question, documents):
+        return [True if doc.page_content in self.accepted else None for doc in documents]
+
+
+class FakeCrossEncoder:
+    """Cross-encoder scoring chunks from a fixed table."""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.pairs = []
+
+    def predict(self, pairs):
+        self.pairs.extend(pairs)
+        return [self.scores[text] for _, text in pairs]
+
+
+class FakeRewriteChain:
+    """Query rewriter returning a fixed question."""
+
+    def invoke(self, inputs):
+        return "rewritten question"
+
+
+@pytest.fixture
+def chains(monkeypatch):
+    """Replace every LLM chain with fakes; generations are grounded and useful by default."""
+    monkeypatch.delenv("GRADER_CROSS_ENCODER", raising=False)
+    fakes = {
+        "generate": FakeGenerateChain(),
+        "hallucination": FakeGenerationGrader(["yes"] * 3, asyncio.Event()),
+        "answer": FakeGenerationGrader(["yes"] * 3, asyncio.Event()),
+    }
+    monkeypatch.setattr(rag_graph, "get_generate_chain", lambda: fakes["generate"])
+    monkeypatch.setattr(rag_graph, "get_hallucination_chain", lambda: fakes["hallucination"])
+    monkeypatch.setattr(rag_graph, "get_answer_chain", lambda: fakes["answer"])
+    monkeypatch.setattr(rag_graph, "get_rewrite_chain", lambda: FakeRewriteChain())
+    return fakes
+
+
+def use_grader(monkeypatch, grader):
+    """Replace the relevance grader chain."""
+    monkeypatch.setattr(rag_graph, "get_grade_chain", lambda: grader)
+
+
+async def run(retriever_docs=DOCS, keyword_scorer=None):
+    """Run the whole graph over `retriever_docs` and return the final state."""
+    graph = build_graph(FakeRetriever(retriever_docs), keyword_scorer)
+    return await graph.ainvoke({"question": "a question"})
+
+
+class TestGradeDocuments:
+    """Test cases for the document relevance grading node."""
+
+    @pytest.mark.asyncio
+    async def test_stops_early_and_cancels_pending_grades(self, monkeypatch, chains):
+        """Once enough chunks are relevant, outstanding grader calls are cancelled."""
+        relevant = [doc.page_content for doc in DOCS[:MAX_RELEVANT_DOCS]]
+        pending = [doc.page_content for doc in DOCS[MAX_RELEVANT_DOCS:]]
+        grader = FakeGradeChain({text: "yes" for text in relevant}, blocked=pending)
+        use_grader(monkeypatch, grader)
+
+        result = await asyncio.wait_for(run(), timeout=5)
+
+        assert result["documents"] == DOCS[:MAX_RELEVANT_DOCS]
+        assert sorted(grader.cancelled) == sorted(pending)
+
+    @pytest.mark.asyncio
+    async def test_keeps_retrieval_order(self, monkeypatch, chains):
+        """Relevant chunks stay in retrieval order whatever order the grades finish in."""
+        verdicts = {DOCS[0].page_content: "yes", DOCS[2].page_content: "Yes."}
+        delays = {DOCS[0].page_content: 0.02}
+        use_grader(monkeypatch, FakeGradeChain(verdicts, delays=delays))
+
+        result = await run()
+
+        assert result["documents"] == [DOCS[0], DOCS[2]]
+
+    @pytest.mark.asyncio
+    async def test_keeps_everything_when_nothing_is_relevant(self, monkeypatch, chains):
+        """If every chunk is graded irrelevant, all retrieved chunks are kept."""
+        use_grader(monkeypatch, FakeGradeChain({}))
+
+        result = await run()
+
+        assert result["documents"] == DOCS
+
+    @pytest.mark.asyncio
+    async def test_keyword_matches_skip_the_llm(self, monkeypatch, chains):
+        """Chunks accepted by the keyword prefilter are never sent to the LLM grader."""
+        grader = FakeGradeChain({DOCS[4].page_content: "yes"})
+        use_grader(monkeypatch, grader)
+        scorer = FakeKeywordScorer([DOCS[1].page_content])
+
+        result = await run(keyword_scorer=scorer)
+
+        assert result["documents"] == [DOCS[1], DOCS[4]]
+        assert DOCS[1].page_content not in grader.graded
+        assert len(grader.graded) == len(DOCS) - 1
+
+    @pytest.mark.asyncio
+    async def test_cross_encoder_replaces_llm_grader(self, monkeypatch, chains):
+        """A configured cross-encoder grades the undecided chunks in one batch, without the LLM."""
+        monkeypatch.setenv("GRADER_CROSS_ENCODER", "fake-model")
+        scores = {doc.page_content: (2.5 if i in (0, 3) else -4.0) for i, doc in enumerate(DOCS)}
+        cross_encoder = FakeCrossEncoder(scores)
+        monkeypatch.setattr(rag_graph, "get_cross_encoder", lambda: cross_encoder)
+        grader = FakeGradeChain({})
+        use_grader(monkeypatch, grader)
+
+        result = await run()
+
+        assert result["documents"] == [DOCS[0], DOCS[3]]
+        assert len(cross_encoder.pairs) == len(DOCS)
+        assert grader.graded == []
+
+    @pytest.mark.asyncio
+    async def test_cross_encoder_not_loaded_when_unconfigured(self, monkeypatch, chains):
+        """Without GRADER_CROSS_ENCODER the cross-encoder loader is never called."""
+        def fail():
+            raise AssertionError("cross-encoder loaded")
+
+        monkeypatch.setattr(rag_graph, "get_cross_encoder", fail)
+        use_grader(monkeypatch, FakeGradeChain({DOCS[0].page_content: "yes"}))
+
+        result = await run()
+
+        assert result["documents"] == [DOCS[0]]
+
+
+class TestGradeGeneration:
+    """Test cases for the hallucination and answer graders."""
+
+    @pytest.mark.asyncio
+    async def test_graders_run_concurrently(self, monkeypatch, chains):
+        """Both graders are in flight at once, so each can see the other start."""
+        hallucination_started, answer_started = asyncio.Event(), asyncio.Event()
+        chains["hallucination"] = FakeGenerationGrader(["yes"], hallucination_started, answer_started)
+        chains["answer"] = FakeGenerationGrader(["yes"], answer_started, hallucination_started)
+        use_grader(monkeypatch, FakeGradeChain({DOCS[0].page_content: "yes"}))
+
+        result = await run()
+
+        assert result["generation"] == "an answer"
+        assert chains["generate"].calls == 1
+
+    @pytest.mark.asyncio
+    async def test_ungrounded_generation_is_retried(self, monkeypatch, chains):
+        """An ungrounded answer is regenerated even though the answer grader said yes."""
+        chains["hallucination"].verdicts = ["no", "yes"]
+        use_grader(monkeypatch, FakeGradeChain({DOCS[0].page_content: "yes"}))
+
+        await run()
+
+        assert chains["generate"].calls == 2
+
+    @pytest.mark.asyncio
+    async def test_unhelpful_generation_rewrites_question(self, monkeypatch, chains):
+        """A grounded answer that doesn't address the question triggers a query rewrite."""
+        chains["answer"].verdicts = ["no", "yes"]
+        use_grader(monkeypatch, FakeGradeChain({DOCS[0].page_content: "yes"}))
+
+        result = await run()
+
+        assert result["question"] == "rewritten question"
+        assert chains["generate"].calls == 2
@@ -0,0 +1,61 @@
+"""Tests for sessions module."""
+
+import asyncio
+import hashlib
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from indexing import build_vectorstore
+from sessions import SessionRegistry
+
+EMBEDDING = DeterministicFakeEmbedding(size=16)
+DOCS = [Document(page_content=f"chunk number {i}") for i in range(5)]
+SESSION_ID = hashlib.sha256(b"some pdf").hexdigest()
+
+
+class TestSessionRegistry:
+    """Test cases for SessionRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_builds_run_once(self, tmp_path):
+        """Simultaneous uploads of the same file build and save the index once."""
+        registry = SessionRegistry(str(tmp_path), lambda: EMBEDDING)
+        builds = 0
+
+        async def build():
+            nonlocal builds
+            builds += 1
+            await asyncio.sleep(0.01)
+            return build_vectorstore(DOCS, EMBEDDING)
+
+        results = await asyncio.gather(*[registry.get_or_build(SESSION_ID, build) for _ in range(3)])
+
+        assert builds == 1
+        assert sorted(built for _, built in results) == [False, False, True]
+        assert len({id(session) for session, _ in results}) == 1
+        assert registry.latest_id == SESSION_ID
+
+    @pytest.mark.asyncio
+    async def test_reload_from_disk(self, tmp_path):
+        """Sessions not in memory are reloaded from their saved index."""
+        async def build():
+            return build_vectorstore(DOCS, EMBEDDING)
+
+        await SessionRegistry(str(tmp_path), lambda: EMBEDDING).get_or_build(SESSION_ID, build)
+        registry = SessionRegistry(str(tmp_path), lambda: EMBEDDING)
+
+        session = await registry.get(SESSION_ID)
+
+        assert session is not None
+        assert session.vectorstore.index.ntotal == len(DOCS)
+
+    @pytest.mark.asyncio
+    async def test_unknown_or_invalid_session(self, tmp_path):
+        """Unknown ids and ids that aren't hashes return None without touching disk paths."""
+        registry = SessionRegistry(str(tmp_path), lambda: EMBEDDING)
+
+        assert await registry.get() is None
+        assert await registry.get("0" * 64) is None
+        assert await registry.get("../etc") is None